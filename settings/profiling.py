@@ -0,0 +1,169 @@
+import cProfile
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core import signing
+from django.db import connection
+from rest_framework.request import Request
+
+
+logger = logging.getLogger(name=__name__)
+
+PROFILING_HEADER = "HTTP_X_PROFILE"
+PROFILING_SALT = "settings.profiling"
+PROFILING_TOKEN_MAX_AGE = 60 * 60
+
+
+def make_profiling_token(username: str) -> str:
+    """Value for the `X-Profile` header of `username`, valid for one hour."""
+    return signing.TimestampSigner(salt=PROFILING_SALT).sign(username)
+
+
+class SQLTrace:
+    """Collects executed statements via connection.execute_wrapper."""
+
+    def __init__(self):
+        self.queries: list[tuple[str, object, bool, float]] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                (sql, params, many, (time.perf_counter() - started) * 1000)
+            )
+
+
+class ProfilingMixin:
+    """
+    Opt-in profiling for ViewSets.
+
+    Enabled only when settings.PROFILING["DIR"] is set. A request is
+    profiled if it carries an `X-Profile` header signed for its user
+    (see make_profiling_token), belongs to one of PROFILING["USERS"]
+    or gets picked by PROFILING["SAMPLE_RATE"].
+    For such request a cProfile dump (.prof, opens in snakeviz/pstats)
+    and a JSON SQL trace with EXPLAIN for slow SELECTs are written to DIR.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if not settings.PROFILING["DIR"]:
+            return super().dispatch(request, *args, **kwargs)
+
+        self._profiling_stack = ExitStack()
+        self._sql_trace = None
+        self._profiling_confirmed = (
+            random.random() < settings.PROFILING["SAMPLE_RATE"]
+        )
+        # стартуем до аутентификации, чтобы она попала в профиль и SQL trace;
+        # подпись заголовка сверяется с пользователем уже в initial()
+        if self._profiling_confirmed or PROFILING_HEADER in request.META:
+            self.start_profiling()
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            # finally, т.к. необработанное исключение из handler
+            # пробрасывается из dispatch без finalize_response
+            self._profiling_stack.close()
+            if self._sql_trace is not None and self._profiling_confirmed:
+                try:
+                    self.dump_profile(request=self.request)
+                except Exception:
+                    logger.exception(msg="Error writing request profile")
+            self._sql_trace = None
+
+    def initial(self, request: Request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if not settings.PROFILING["DIR"] or self._profiling_confirmed:
+            return
+        self._profiling_confirmed = self.should_profile(request)
+        if self._profiling_confirmed and self._sql_trace is None:
+            self.start_profiling()
+        elif not self._profiling_confirmed and self._sql_trace is not None:
+            self._profiling_stack.close()
+            self._sql_trace = None
+
+    def start_profiling(self) -> None:
+        self._sql_trace = SQLTrace()
+        self._profiling_stack.enter_context(
+            connection.execute_wrapper(self._sql_trace)
+        )
+        self._profiler = cProfile.Profile()
+        try:
+            self._profiler.enable()
+        except ValueError:
+            # на 3.12+ уже работает другой профилировщик (sys.monitoring)
+            logger.warning(msg="Another profiler is active, skip profiling")
+            self._profiling_stack.close()
+            self._sql_trace = None
+            return
+        self._profiling_stack.callback(self._profiler.disable)
+
+    def should_profile(self, request: Request) -> bool:
+        """Called after authentication, sampling is decided in dispatch()."""
+        if not request.user.is_authenticated:
+            return False
+        username = request.user.username
+        token = request.META.get(PROFILING_HEADER)
+        if token:
+            try:
+                signed_username = signing.TimestampSigner(
+                    salt=PROFILING_SALT
+                ).unsign(token, max_age=PROFILING_TOKEN_MAX_AGE)
+                if signed_username == username:
+                    return True
+                logger.warning(msg="Profiling token of another user")
+            except signing.BadSignature:
+                logger.warning(msg="Invalid profiling token")
+        return username in settings.PROFILING["USERS"]
+
+    def dump_profile(self, request: Request) -> None:
+        directory = settings.PROFILING["DIR"]
+        os.makedirs(directory, exist_ok=True)
+        name = "{}-{}-{}-{}".format(
+            time.strftime("%Y%m%d-%H%M%S"), self.__class__.__name__,
+            getattr(self, "action", None), uuid.uuid4().hex[:8]
+        )
+        self._profiler.dump_stats(os.path.join(directory, f"{name}.prof"))
+
+        slow_ms = settings.PROFILING["SLOW_QUERY_MS"]
+        queries = []
+        for sql, params, many, duration_ms in self._sql_trace.queries:
+            query = {
+                "sql": sql,
+                "params": params,
+                "many": many,
+                "duration_ms": duration_ms,
+            }
+            if duration_ms >= slow_ms and not many \
+            and sql.lstrip().upper().startswith("SELECT"):
+                query["explain"] = self.explain(sql=sql, params=params)
+            queries.append(query)
+
+        trace = {
+            "method": request.method,
+            "path": request.get_full_path(),
+            "user": getattr(request.user, "username", None),
+            "total_sql_ms": sum(query["duration_ms"] for query in queries),
+            "queries": queries,
+        }
+        with open(os.path.join(directory, f"{name}.sql.json"), "w") as f:
+            json.dump(trace, f, ensure_ascii=False, indent=2, default=str)
+
+    def explain(self, sql: str, params) -> list | None:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"{connection.ops.explain_query_prefix()} {sql}", params
+                )
+                return cursor.fetchall()
+        except Exception:
+            logger.exception(msg="Error explaining query")
+            return None
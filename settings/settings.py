@@ -2,7 +2,7 @@ from pathlib import Path
 from datetime import timedelta
 import os
 
-from decouple import config
+from decouple import config, Csv
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -114,6 +114,15 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Профилирование запросов к TasksViewSet/UsersViewSet (settings/profiling.py).
+# Выключено, пока не задан PROFILING_DIR.
+PROFILING = {
+    "DIR": config("PROFILING_DIR", default=""),
+    "USERS": config("PROFILING_USERS", default="", cast=Csv()),
+    "SAMPLE_RATE": config("PROFILING_SAMPLE_RATE", default=0.0, cast=float),
+    "SLOW_QUERY_MS": config("PROFILING_SLOW_QUERY_MS", default=100, cast=int),
+}
+
 SWAGGER_SETTINGS = {
     "SECURITY_DEFINITIONS": {
         "Bearer": {
@@ -0,0 +1,321 @@
+import csv
+import json
+import os
+import time
+from pathlib import Path
+from typing import Iterator
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework import serializers
+
+from tasks.models import Task, Status
+from tasks.serializers import TaskSerializer
+
+
+class Command(BaseCommand):
+    """
+    Bulk import of tasks from CSV or JSONL.
+
+    Rows are validated with the same field rules as TaskSerializer,
+    but the database checks (owner lookup, unique unfinished titles)
+    are done once per batch instead of once per row. Valid rows are
+    written with COPY on PostgreSQL and bulk_create elsewhere.
+    Progress is stored in a checkpoint file after every committed batch,
+    so an interrupted import can be restarted with the same arguments.
+    """
+    help = "Import tasks from a CSV or JSONL file."
+
+    columns = ("title", "description", "status", "due_date")
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path)
+        parser.add_argument(
+            "--format", choices=["csv", "jsonl"],
+            help="Input format, detected by file extension by default."
+        )
+        parser.add_argument(
+            "--user",
+            help="Username of the owner for rows without a 'user' column."
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--checkpoint", type=Path,
+            help="File to store progress in and resume from."
+        )
+        parser.add_argument(
+            "--rejects", type=Path,
+            help=(
+                "CSV file for rejected rows (stderr by default): row number, "
+                "source line, errors and the original row as JSON."
+            )
+        )
+
+    def handle(self, *args, **options):
+        path: Path = options["path"]
+        if not path.exists():
+            raise CommandError(f"File '{path}' does not exist.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size should be positive.")
+
+        input_format = options["format"] or path.suffix.lstrip(".").lower()
+        if input_format not in ("csv", "jsonl"):
+            raise CommandError(
+                "Cannot detect input format, use --format csv|jsonl."
+            )
+
+        self.serializer = TaskSerializer()
+        self.usernames: dict[str, int] = {}
+        self.default_user = options["user"]
+        if self.default_user is not None:
+            self.resolve_users({self.default_user})
+            if self.default_user not in self.usernames:
+                raise CommandError(f"User '{self.default_user}' not found.")
+
+        checkpoint: Path | None = options["checkpoint"]
+        offset = self.read_checkpoint(checkpoint=checkpoint, path=path)
+        if offset:
+            self.stdout.write(f"Resuming from row {offset}.")
+
+        rejects_file = (
+            options["rejects"].open("a", newline="", encoding="utf-8")
+            if options["rejects"] else None
+        )
+        self.rejects_writer = (
+            csv.writer(rejects_file) if rejects_file else None
+        )
+        if rejects_file and rejects_file.tell() == 0:
+            self.rejects_writer.writerow(["row", "line", "errors", "data"])
+
+        imported = rejected = 0
+        started = time.monotonic()
+        try:
+            rows = self.read_rows(path=path, input_format=input_format)
+            batch: list[tuple[int, int, dict]] = []
+            for row_number, (line, row) in enumerate(rows, start=1):
+                if row_number <= offset:
+                    continue
+                batch.append((row_number, line, row))
+                if len(batch) < options["batch_size"]:
+                    continue
+                ok, bad = self.commit_batch(
+                    batch=batch, checkpoint=checkpoint, path=path
+                )
+                imported += ok
+                rejected += bad
+                self.report(imported, rejected, started)
+                batch = []
+            if batch:
+                ok, bad = self.commit_batch(
+                    batch=batch, checkpoint=checkpoint, path=path
+                )
+                imported += ok
+                rejected += bad
+        finally:
+            if rejects_file:
+                rejects_file.close()
+
+        self.report(imported, rejected, started, final=True)
+
+    def read_rows(
+        self, path: Path, input_format: str
+    ) -> Iterator[tuple[int, dict]]:
+        """Yields (source line number, row)."""
+        # utf-8-sig: Excel и многие выгрузки пишут BOM в начало CSV
+        with path.open(newline="", encoding="utf-8-sig") as f:
+            if input_format == "csv":
+                reader = csv.DictReader(f)
+                for row in reader:
+                    # для многострочных значений это строка конца записи
+                    yield reader.line_num, row
+                return
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    row = {"__error__": f"Invalid JSON: {e}", "__raw__": line}
+                if not isinstance(row, dict):
+                    row = {
+                        "__error__": "Row should be a JSON object.",
+                        "__raw__": line
+                    }
+                yield line_number, row
+
+    def read_checkpoint(self, checkpoint: Path | None, path: Path) -> int:
+        if checkpoint is None or not checkpoint.exists():
+            return 0
+        try:
+            data = json.loads(checkpoint.read_text())
+            source, offset = data["source"], data["offset"]
+        except (ValueError, TypeError, KeyError) as e:
+            raise CommandError(
+                f"Checkpoint '{checkpoint}' is corrupted: {e!r}."
+            )
+        if not isinstance(offset, int) or offset < 0:
+            raise CommandError(
+                f"Checkpoint '{checkpoint}' is corrupted: bad offset."
+            )
+        if source != str(path.resolve()):
+            raise CommandError(
+                f"Checkpoint '{checkpoint}' belongs to another file."
+            )
+        return offset
+
+    def write_checkpoint(
+        self, checkpoint: Path | None, path: Path, offset: int
+    ) -> None:
+        if checkpoint is None:
+            return
+        tmp = checkpoint.with_name(f"{checkpoint.name}.tmp")
+        tmp.write_text(json.dumps(
+            {"source": str(path.resolve()), "offset": offset}
+        ))
+        os.replace(tmp, checkpoint)
+
+    def resolve_users(self, usernames: set[str]) -> None:
+        missing = usernames - self.usernames.keys()
+        if missing:
+            self.usernames.update(
+                User.objects.filter(username__in=missing)
+                .values_list("username", "id")
+            )
+
+    def validate_row(self, row: dict) -> dict:
+        """Field rules of TaskSerializer, without database lookups."""
+        if "__error__" in row:
+            raise serializers.ValidationError(row["__error__"])
+
+        fields = self.serializer.fields
+        data, errors = {}, {}
+        for name in self.columns:
+            value = row.get(name)
+            if name == "status" and value in (None, ""):
+                value = Status.NEW
+            try:
+                value = fields[name].run_validation(value)
+                validator = getattr(self.serializer, f"validate_{name}", None)
+                # validate_title ходит в БД, проверяем его пачкой ниже
+                if validator is not None and name != "title":
+                    value = validator(value)
+                data[name] = value
+            except serializers.ValidationError as e:
+                errors[name] = e.detail
+
+        username = row.get("user") or self.default_user
+        if not username:
+            errors["user"] = ["This field is required."]
+        elif not isinstance(username, str):
+            errors["user"] = ["Username should be a string."]
+        elif username not in self.usernames:
+            errors["user"] = [f"User '{username}' not found."]
+        else:
+            data["user_id"] = self.usernames[username]
+
+        if errors:
+            raise serializers.ValidationError(errors)
+        return data
+
+    def commit_batch(
+        self, batch: list[tuple[int, int, dict]], checkpoint: Path | None,
+        path: Path
+    ) -> tuple[int, int]:
+        imported, rejects = self.process_batch(batch=batch)
+        # пишем отказы только после коммита пачки, иначе при откате
+        # и повторном запуске они попадут в --rejects дважды
+        rows = {row_number: (line, row) for row_number, line, row in batch}
+        for row_number, errors in rejects:
+            line, row = rows[row_number]
+            self.reject(
+                row_number=row_number, line=line, row=row, errors=errors
+            )
+        self.write_checkpoint(
+            checkpoint=checkpoint, path=path, offset=batch[-1][0]
+        )
+        return imported, len(rejects)
+
+    def process_batch(
+        self, batch: list[tuple[int, int, dict]]
+    ) -> tuple[int, list[tuple[int, dict]]]:
+        self.resolve_users({
+            row["user"] for _, _, row in batch
+            if isinstance(row.get("user"), str) and row["user"]
+        })
+
+        valid: list[tuple[int, dict]] = []
+        rejects: list[tuple[int, dict]] = []
+        for row_number, _, row in batch:
+            try:
+                valid.append((row_number, self.validate_row(row=row)))
+            except serializers.ValidationError as e:
+                rejects.append((row_number, e.detail))
+
+        with transaction.atomic():
+            existing = set(
+                Task.objects.filter(
+                    user_id__in={data["user_id"] for _, data in valid},
+                    title__in={data["title"] for _, data in valid}
+                ).exclude(status=Status.DONE).values_list("user_id", "title")
+            )
+            tasks: list[Task] = []
+            for row_number, data in valid:
+                key = (data["user_id"], data["title"])
+                if key in existing:
+                    rejects.append((row_number, {"title": [
+                        "You're already have incomplete task with this title!"
+                    ]}))
+                    continue
+                existing.add(key)
+                tasks.append(Task(**data))
+            self.insert(tasks=tasks)
+        return len(tasks), sorted(rejects)
+
+    def insert(self, tasks: list[Task]) -> None:
+        if not tasks:
+            return
+        if connection.vendor != "postgresql":
+            Task.objects.bulk_create(tasks)
+            return
+
+        quote_name = connection.ops.quote_name
+        fields = [Task._meta.get_field(name) for name in (
+            "title", "description", "status", "due_date", "user"
+        )]
+        sql = "COPY {} ({}) FROM STDIN".format(
+            quote_name(Task._meta.db_table),
+            ", ".join(quote_name(field.column) for field in fields)
+        )
+        with connection.cursor() as cursor:
+            with cursor.cursor.copy(sql) as copy:
+                for task in tasks:
+                    copy.write_row([
+                        getattr(task, field.attname) for field in fields
+                    ])
+
+    def reject(self, row_number: int, line: int, row: dict, errors) -> None:
+        errors = json.dumps(errors, ensure_ascii=False)
+        data = row.get("__raw__") or json.dumps(row, ensure_ascii=False)
+        if self.rejects_writer is not None:
+            self.rejects_writer.writerow([row_number, line, errors, data])
+        else:
+            self.stderr.write(
+                f"Row {row_number} (line {line}): {errors} {data}"
+            )
+
+    def report(
+        self, imported: int, rejected: int, started: float,
+        final: bool = False
+    ) -> None:
+        elapsed = time.monotonic() - started
+        rate = (imported + rejected) / elapsed if elapsed else 0
+        message = (
+            f"Imported {imported}, rejected {rejected} "
+            f"({rate:.0f} rows/s, {elapsed:.1f}s)"
+        )
+        if final:
+            self.stdout.write(self.style.SUCCESS(message))
+        else:
+            self.stdout.write(message)
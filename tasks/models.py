@@ -31,6 +31,11 @@ class Task(models.Model):
 
     class Meta:
         ordering = ("id",)
+        indexes = [
+            models.Index(
+                fields=["user", "due_date"], name="task_user_due_date_idx"
+            ),
+        ]
         verbose_name = "задача"
         verbose_name_plural = "задачи"
 
@@ -5,9 +5,18 @@ from tasks.models import Task, Status
 
 
 class TaskSerializer(serializers.ModelSerializer):
+    """
+    Accepts optional `fields` / `exclude` kwargs to serialize
+    only a subset of fields (sparse fieldsets).
+    """
+
     is_overdue = serializers.SerializerMethodField(
         method_name="get_is_overdue"
     )
+    # поля модели, от которых зависят вычисляемые поля
+    computed_fields_sources = {
+        "is_overdue": ("due_date", "status"),
+    }
 
     class Meta:
         model = Task
@@ -17,6 +26,47 @@ class TaskSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "is_overdue", "user"]
 
+    def __init__(
+        self,
+        *args,
+        fields: list[str] | None = None,
+        exclude: list[str] | None = None,
+        **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        if fields is None and exclude is None:
+            return
+        selected = self.select_fields(fields=fields, exclude=exclude)
+        for name in list(self.fields):
+            if name not in selected:
+                self.fields.pop(name)
+
+    @classmethod
+    def select_fields(
+        cls,
+        fields: list[str] | None = None,
+        exclude: list[str] | None = None
+    ) -> list[str]:
+        selected = fields if fields is not None else cls.Meta.fields
+        return [
+            name for name in cls.Meta.fields
+            if name in selected and name not in (exclude or [])
+        ]
+
+    @classmethod
+    def get_model_fields(
+        cls,
+        fields: list[str] | None = None,
+        exclude: list[str] | None = None
+    ) -> list[str]:
+        """Model fields to load from the DB, for QuerySet.only()."""
+        model_fields = []
+        for name in cls.select_fields(fields=fields, exclude=exclude):
+            for source in cls.computed_fields_sources.get(name, (name,)):
+                if source not in model_fields:
+                    model_fields.append(source)
+        return model_fields
+
     def get_is_overdue(self, obj) -> bool:
         return (
             obj.due_date < timezone.now().date()
@@ -65,6 +115,35 @@ class TaskQuerySerializer(serializers.Serializer):
     sortBy = serializers.ChoiceField(
         choices=["due_date"], required=False
     )
+    due_before = serializers.DateField(required=False)
+    due_after = serializers.DateField(required=False)
+    # allow_null, иначе отсутствующий в query params bool превращается в False
+    overdue = serializers.BooleanField(required=False, allow_null=True)
+    fields = serializers.CharField(
+        required=False,
+        help_text="Comma separated list of fields to return."
+    )
+    exclude = serializers.CharField(
+        required=False,
+        help_text="Comma separated list of fields to omit."
+    )
+
+    def parse_field_names(self, value: str) -> list[str]:
+        names = [name.strip() for name in value.split(",") if name.strip()]
+        unknown = [
+            name for name in names if name not in TaskSerializer.Meta.fields
+        ]
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown fields: {', '.join(unknown)}."
+            )
+        return names
+
+    def validate_fields(self, value: str) -> list[str]:
+        return self.parse_field_names(value)
+
+    def validate_exclude(self, value: str) -> list[str]:
+        return self.parse_field_names(value)
 
     def validate(self, attrs):
         order = attrs.get("order")
@@ -78,4 +157,11 @@ class TaskQuerySerializer(serializers.Serializer):
             raise serializers.ValidationError({
                 "order": "This field is required when 'sortBy' is provided."
             })
+
+        due_before = attrs.get("due_before")
+        due_after = attrs.get("due_after")
+        if due_before and due_after and due_after > due_before:
+            raise serializers.ValidationError({
+                "due_after": "This date should not be later than 'due_before'."
+            })
         return attrs
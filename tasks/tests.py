@@ -1,3 +1,475 @@
-from django.test import TestCase
+import csv
+import json
+import sys
+import tempfile
+import unittest
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, IntegrityError
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from settings.profiling import make_profiling_token
+from tasks.models import Task, Status
+
+
+class ImportTasksCommandTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="bob", password="x")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.future = (timezone.now().date() + timedelta(days=10)).isoformat()
+        self.past = (timezone.now().date() - timedelta(days=10)).isoformat()
+
+    def write(self, name: str, content: str) -> Path:
+        path = Path(self.tmp.name) / name
+        path.write_text(content, encoding="utf-8")
+        return path
+
+    def write_csv(self, rows: list[str]) -> Path:
+        return self.write(
+            "tasks.csv",
+            "title,description,status,due_date,user\n" + "\n".join(rows) + "\n"
+        )
+
+    def read_rejects(self) -> list[dict]:
+        rejects = Path(self.tmp.name) / "rejects.csv"
+        if not rejects.exists():
+            return []
+        with rejects.open(newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+
+    def run_import(self, path: Path, *args) -> list[list[str]]:
+        call_command(
+            "import_tasks", str(path),
+            "--rejects", str(Path(self.tmp.name) / "rejects.csv"), *args,
+            stdout=StringIO(), stderr=StringIO()
+        )
+        return [[row["row"], row["errors"]] for row in self.read_rejects()]
+
+    def test_rejects_invalid_rows(self):
+        path = self.write_csv([
+            f"ok,d,,{self.future},bob",
+            f"done,d,done,{self.future},bob",
+            f"past,d,new,{self.past},bob",
+            f"blank,,new,{self.future},bob",
+            f"nouser,d,new,{self.future},alice",
+        ])
+        rejects = self.run_import(path)
+
+        self.assertEqual(
+            list(Task.objects.values_list("title", "status")),
+            [("ok", Status.NEW)]
+        )
+        self.assertEqual([row for row, _ in rejects], ["2", "3", "4", "5"])
+        self.assertIn("status", rejects[0][1])
+        self.assertIn("due_date", rejects[1][1])
+        self.assertIn("description", rejects[2][1])
+        self.assertIn("user", rejects[3][1])
+
+    def test_csv_with_bom(self):
+        path = Path(self.tmp.name) / "tasks.csv"
+        path.write_text(
+            f"title,description,due_date\nt,d,{self.future}\n",
+            encoding="utf-8-sig"
+        )
+        rejects = self.run_import(path, "--user", "bob")
+
+        self.assertEqual(rejects, [])
+        self.assertEqual(
+            list(Task.objects.values_list("title", flat=True)), ["t"]
+        )
+
+    def test_rejects_file_keeps_source_data(self):
+        path = self.write("tasks.jsonl", "\n".join([
+            json.dumps({
+                "title": "ok", "description": "d", "due_date": self.future
+            }),
+            "",
+            json.dumps({
+                "title": "past", "description": "d", "due_date": self.past
+            }),
+            "not json",
+        ]))
+        self.run_import(path, "--user", "bob")
+        # повторный запуск дописывает в тот же файл без второго заголовка
+        self.run_import(path, "--user", "bob")
+
+        rejects = self.read_rejects()
+        self.assertEqual(
+            [(row["row"], row["line"]) for row in rejects],
+            [("2", "3"), ("3", "4"), ("1", "1"), ("2", "3"), ("3", "4")]
+        )
+        self.assertEqual(json.loads(rejects[0]["data"]), {
+            "title": "past", "description": "d", "due_date": self.past
+        })
+        self.assertIn("due_date", json.loads(rejects[0]["errors"]))
+        self.assertEqual(rejects[1]["data"], "not json")
+
+    def test_rejects_duplicate_unfinished_titles(self):
+        Task.objects.create(
+            title="existing", description="d", due_date=self.future,
+            user=self.user
+        )
+        Task.objects.create(
+            title="finished", description="d", due_date=self.future,
+            user=self.user, status=Status.DONE
+        )
+        path = self.write_csv([
+            f"existing,d,,{self.future},bob",
+            f"finished,d,,{self.future},bob",
+            f"twice,d,,{self.future},bob",
+            f"twice,d,,{self.future},bob",
+        ])
+        rejects = self.run_import(path, "--batch-size", "10")
+
+        self.assertEqual([row for row, _ in rejects], ["1", "4"])
+        self.assertEqual(
+            Task.objects.filter(title="twice").count(), 1
+        )
+        self.assertEqual(
+            Task.objects.filter(title="finished").count(), 2
+        )
+
+    def test_duplicate_titles_across_batches(self):
+        path = self.write_csv([
+            f"same,d,,{self.future},bob",
+            f"same,d,,{self.future},bob",
+        ])
+        rejects = self.run_import(path, "--batch-size", "1")
+
+        self.assertEqual([row for row, _ in rejects], ["2"])
+        self.assertEqual(Task.objects.filter(title="same").count(), 1)
+
+    def test_user_fallback_and_jsonl(self):
+        other = User.objects.create_user(username="carl", password="x")
+        path = self.write("tasks.jsonl", "\n".join([
+            json.dumps({
+                "title": "default", "description": "d",
+                "due_date": self.future
+            }),
+            json.dumps({
+                "title": "explicit", "description": "d",
+                "due_date": self.future, "user": "carl"
+            }),
+            "not json",
+        ]))
+        rejects = self.run_import(path, "--user", "bob")
+
+        self.assertEqual(Task.objects.get(title="default").user, self.user)
+        self.assertEqual(Task.objects.get(title="explicit").user, other)
+        self.assertEqual([row for row, _ in rejects], ["3"])
+
+    def test_non_string_user_rejected(self):
+        path = self.write("tasks.jsonl", "\n".join([
+            json.dumps({
+                "title": f"t{i}", "description": "d",
+                "due_date": self.future, "user": user
+            })
+            for i, user in enumerate((["bob"], {"name": "bob"}, 1, "bob"))
+        ]))
+        rejects = self.run_import(path, "--user", "bob")
+
+        self.assertEqual(
+            list(Task.objects.values_list("title", flat=True)), ["t3"]
+        )
+        self.assertEqual([row for row, _ in rejects], ["1", "2", "3"])
+        for _, errors in rejects:
+            self.assertIn("user", errors)
+
+    def test_missing_user_without_fallback(self):
+        path = self.write("tasks.jsonl", json.dumps({
+            "title": "t", "description": "d", "due_date": self.future
+        }))
+        rejects = self.run_import(path)
+
+        self.assertFalse(Task.objects.exists())
+        self.assertIn("user", rejects[0][1])
+
+    def test_resume_from_checkpoint(self):
+        checkpoint = Path(self.tmp.name) / "import.ckpt"
+        path = self.write_csv([
+            f"t{i},d,,{self.future},bob" for i in range(1, 6)
+        ])
+        checkpoint.write_text(json.dumps(
+            {"source": str(path.resolve()), "offset": 3}
+        ))
+        self.run_import(path, "--checkpoint", str(checkpoint))
+
+        self.assertEqual(
+            list(Task.objects.values_list("title", flat=True)), ["t4", "t5"]
+        )
+        self.assertEqual(json.loads(checkpoint.read_text())["offset"], 5)
+
+        # повторный запуск ничего не добавляет
+        self.run_import(path, "--checkpoint", str(checkpoint))
+        self.assertEqual(Task.objects.count(), 2)
+
+    def test_corrupted_checkpoint(self):
+        checkpoint = Path(self.tmp.name) / "import.ckpt"
+        path = self.write_csv([f"t,d,,{self.future},bob"])
+        for content in ("{", json.dumps({"offset": 1}), json.dumps(
+            {"source": str(path.resolve()), "offset": "x"}
+        )):
+            checkpoint.write_text(content)
+            with self.assertRaises(CommandError):
+                self.run_import(path, "--checkpoint", str(checkpoint))
+
+    def test_checkpoint_of_another_file(self):
+        checkpoint = Path(self.tmp.name) / "import.ckpt"
+        checkpoint.write_text(json.dumps({"source": "/other", "offset": 1}))
+        path = self.write_csv([f"t,d,,{self.future},bob"])
+        with self.assertRaises(CommandError):
+            self.run_import(path, "--checkpoint", str(checkpoint))
+
+    def test_failed_batch_writes_no_rejects(self):
+        checkpoint = Path(self.tmp.name) / "import.ckpt"
+        path = self.write_csv([
+            f"ok,d,,{self.future},bob",
+            f"past,d,,{self.past},bob",
+        ])
+        with mock.patch(
+            "tasks.management.commands.import_tasks.Command.insert",
+            side_effect=IntegrityError
+        ), self.assertRaises(IntegrityError):
+            self.run_import(path, "--checkpoint", str(checkpoint))
+        self.assertFalse(checkpoint.exists())
+        self.assertEqual(self.read_rejects(), [])
+
+        rejects = self.run_import(path, "--checkpoint", str(checkpoint))
+        self.assertEqual([row for row, _ in rejects], ["2"])
+        self.assertEqual(Task.objects.count(), 1)
+
+    @unittest.skipIf(
+        connection.vendor == "postgresql", "bulk_create fallback only"
+    )
+    def test_bulk_create_fallback(self):
+        path = self.write_csv([
+            f"t{i},d,,{self.future},bob" for i in range(7)
+        ])
+        # один запрос пользователей и на каждую из трёх пачек:
+        # SAVEPOINT, поиск дублей, INSERT, RELEASE SAVEPOINT
+        with self.assertNumQueries(1 + 3 * 4):
+            self.run_import(path, "--batch-size", "3", "--user", "bob")
+        self.assertEqual(Task.objects.count(), 7)
+
+    @unittest.skipUnless(
+        connection.vendor == "postgresql", "COPY requires PostgreSQL"
+    )
+    def test_copy_insert(self):
+        path = self.write_csv([
+            f"t{i},описание {i},,{self.future},bob" for i in range(3)
+        ])
+        rejects = self.run_import(path)
+
+        self.assertEqual(rejects, [])
+        task = Task.objects.get(title="t1")
+        self.assertEqual(task.description, "описание 1")
+        self.assertEqual(task.status, Status.NEW)
+        self.assertEqual(task.due_date.isoformat(), self.future)
+        self.assertEqual(task.user, self.user)
+
+
+class TaskListFieldsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="bob", password="x")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        today = timezone.now().date()
+        Task.objects.create(
+            title="overdue", description="long text",
+            due_date=today - timedelta(days=1), user=self.user
+        )
+        Task.objects.create(
+            title="done", description="long text", status=Status.DONE,
+            due_date=today - timedelta(days=1), user=self.user
+        )
+
+    def get_tasks(self, query: str):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"/api/v1/tasks/?{query}")
+        return response, [query["sql"] for query in queries]
+
+    def test_fields_skip_description_in_sql(self):
+        response, queries = self.get_tasks("fields=title")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["results"], [{"title": "overdue"}, {"title": "done"}]
+        )
+        self.assertTrue(queries)
+        for sql in queries:
+            self.assertNotIn("description", sql)
+
+    def test_exclude_description(self):
+        response, queries = self.get_tasks("exclude=description")
+
+        self.assertEqual(response.status_code, 200)
+        result = response.json()["results"][0]
+        self.assertNotIn("description", result)
+        self.assertIn("due_date", result)
+        for sql in queries:
+            self.assertNotIn("description", sql)
+
+    def test_computed_field_loads_its_sources(self):
+        response, queries = self.get_tasks("fields=title,is_overdue")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"], [
+            {"title": "overdue", "is_overdue": True},
+            {"title": "done", "is_overdue": False},
+        ])
+        select = queries[-1]
+        self.assertIn("due_date", select)
+        self.assertIn("status", select)
+        # без лишних запросов на догрузку отложенных полей
+        self.assertEqual(len(queries), 2)
+
+    def test_unknown_field(self):
+        response, _ = self.get_tasks("fields=title,secret")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("fields", response.json())
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="bob", password="x")
+        self.client = APIClient(raise_request_exception=False)
+        self.client.force_authenticate(user=self.user)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        profiling = {
+            "DIR": self.tmp.name, "USERS": [],
+            "SAMPLE_RATE": 0.0, "SLOW_QUERY_MS": 0,
+        }
+        patcher = override_settings(PROFILING=profiling)
+        patcher.enable()
+        self.addCleanup(patcher.disable)
+
+    def get_tasks(self, token: str | None = None, url="/api/v1/tasks/"):
+        headers = {"HTTP_X_PROFILE": token} if token else {}
+        return self.client.get(url, **headers)
+
+    def dumps(self) -> list[str]:
+        return sorted(path.suffix for path in Path(self.tmp.name).iterdir())
+
+    def test_token_of_user_accepted(self):
+        response = self.get_tasks(token=make_profiling_token("bob"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.dumps(), [".json", ".prof"])
+        trace = json.loads(next(Path(self.tmp.name).glob("*.json")).read_text())
+        self.assertEqual(trace["user"], "bob")
+        self.assertTrue(trace["queries"])
+        self.assertIn("explain", trace["queries"][0])
+
+    def test_token_of_another_user_rejected(self):
+        response = self.get_tasks(token=make_profiling_token("alice"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.dumps(), [])
+
+    def test_forged_token_rejected(self):
+        self.get_tasks(token="bob:forged")
+        self.assertEqual(self.dumps(), [])
+
+    def test_expired_token_rejected(self):
+        token = make_profiling_token("bob")
+        with mock.patch("settings.profiling.PROFILING_TOKEN_MAX_AGE", -1):
+            self.get_tasks(token=token)
+        self.assertEqual(self.dumps(), [])
+
+    def test_no_token(self):
+        self.get_tasks()
+        self.assertEqual(self.dumps(), [])
+
+    def test_profiled_users(self):
+        with self.settings(PROFILING={
+            "DIR": self.tmp.name, "USERS": ["bob"],
+            "SAMPLE_RATE": 0.0, "SLOW_QUERY_MS": 0,
+        }):
+            self.get_tasks()
+        self.assertEqual(self.dumps(), [".json", ".prof"])
+
+    def test_unhandled_error_stops_profiling(self):
+        response = self.get_tasks(
+            token=make_profiling_token("bob"), url="/api/v1/tasks/abc/"
+        )
+
+        self.assertEqual(response.status_code, 500)
+        self.assertIsNone(sys.getprofile())
+        self.assertEqual(connection.execute_wrappers, [])
+        self.assertEqual(self.dumps(), [".json", ".prof"])
+
+
+class TaskListDueDateFiltersTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="bob", password="x")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.today = timezone.now().date()
+        for title, days, task_status in (
+            ("overdue", -1, Status.NEW),
+            ("done late", -1, Status.DONE),
+            ("today", 0, Status.IN_PROGRESS),
+            ("next week", 7, Status.NEW),
+        ):
+            Task.objects.create(
+                title=title, description="d", status=task_status,
+                due_date=self.today + timedelta(days=days), user=self.user
+            )
+
+    def get_titles(self, **params) -> list[str]:
+        response = self.client.get("/api/v1/tasks/", data=params)
+        self.assertEqual(response.status_code, 200)
+        return [task["title"] for task in response.json()["results"]]
+
+    def test_overdue_omitted(self):
+        self.assertEqual(
+            self.get_titles(),
+            ["overdue", "done late", "today", "next week"]
+        )
+
+    def test_overdue_true(self):
+        self.assertEqual(self.get_titles(overdue="true"), ["overdue"])
+
+    def test_overdue_false(self):
+        self.assertEqual(
+            self.get_titles(overdue="false"),
+            ["done late", "today", "next week"]
+        )
+
+    def test_due_date_bounds_are_inclusive(self):
+        self.assertEqual(
+            self.get_titles(
+                due_after=self.today.isoformat(),
+                due_before=(self.today + timedelta(days=7)).isoformat()
+            ),
+            ["today", "next week"]
+        )
+        self.assertEqual(
+            self.get_titles(due_before=self.today.isoformat()),
+            ["overdue", "done late", "today"]
+        )
+
+    def test_due_after_later_than_due_before(self):
+        response = self.client.get("/api/v1/tasks/", data={
+            "due_after": self.today.isoformat(),
+            "due_before": (self.today - timedelta(days=1)).isoformat(),
+        })
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("due_after", response.json())
+
+    def test_invalid_overdue(self):
+        response = self.client.get("/api/v1/tasks/", data={"overdue": "maybe"})
+        self.assertEqual(response.status_code, 400)
@@ -6,18 +6,20 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.viewsets import ViewSet
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework import status
-from django.db.models import QuerySet
+from django.db.models import QuerySet, Q
+from django.utils import timezone
 from django.shortcuts import get_object_or_404
 from drf_yasg.utils import swagger_auto_schema
 
-from tasks.models import Task
+from settings.profiling import ProfilingMixin
+from tasks.models import Task, Status
 from tasks.serializers import TaskSerializer, TaskQuerySerializer
 
 
 logger = logging.getLogger(name=__name__)
 
 
-class TasksViewSet(ViewSet):
+class TasksViewSet(ProfilingMixin, ViewSet):
     permission_classes = [IsAuthenticated]
     pagination_class = LimitOffsetPagination()
     create_update_responses = {
@@ -85,22 +87,52 @@ class TasksViewSet(ViewSet):
         task_status = filters.get("status")
         sort_by = filters.get("sortBy")
         order = filters.get("order")
+        due_before = filters.get("due_before")
+        due_after = filters.get("due_after")
+        overdue = filters.get("overdue")
+        fields = filters.get("fields")
+        exclude = filters.get("exclude")
 
         if title:
             tasks = tasks.filter(title__icontains=title)
         if task_status:
             tasks = tasks.filter(status=task_status)
+        if due_before:
+            tasks = tasks.filter(due_date__lte=due_before)
+        if due_after:
+            tasks = tasks.filter(due_date__gte=due_after)
+        if overdue is not None:
+            # то же условие, что и в TaskSerializer.get_is_overdue, но в SQL
+            today = timezone.now().date()
+            if overdue:
+                tasks = tasks.filter(due_date__lt=today).exclude(
+                    status=Status.DONE
+                )
+            else:
+                tasks = tasks.filter(
+                    Q(due_date__gte=today) | Q(status=Status.DONE)
+                )
         if sort_by:
             ordering = sort_by if order == "asc" else f"-{sort_by}"
             tasks = tasks.order_by(ordering)
+        if fields is not None or exclude is not None:
+            # не читаем из БД поля, которые не попадут в ответ (например description).
+            # user нужен всегда: related manager проставляет task.user по user_id
+            tasks = tasks.only("user", *TaskSerializer.get_model_fields(
+                fields=fields, exclude=exclude
+            ))
 
         page = self.paginate_queryset(queryset=tasks)
         if not page:
-            serializer = TaskSerializer(instance=tasks, many=True)
+            serializer = TaskSerializer(
+                instance=tasks, many=True, fields=fields, exclude=exclude
+            )
             return Response(
                 data=serializer.data, status=status.HTTP_200_OK
             )
-        serializer = TaskSerializer(instance=page, many=True)
+        serializer = TaskSerializer(
+            instance=page, many=True, fields=fields, exclude=exclude
+        )
         return self.get_paginated_response(data=serializer.data)
 
     @swagger_auto_schema(
@@ -7,13 +7,14 @@ from rest_framework.viewsets import ViewSet
 from rest_framework import status
 from drf_yasg.utils import swagger_auto_schema
 
+from settings.profiling import ProfilingMixin
 from users.serializers import UserSerializer
 
 
 logger = logging.getLogger(name=__name__)
 
 
-class UsersViewSet(ViewSet):
+class UsersViewSet(ProfilingMixin, ViewSet):
     """
     ViewSet for handling Users' objects.
     For now it's just registration,